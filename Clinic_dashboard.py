@@ -1,9 +1,14 @@
+import copy
+import hashlib
+import io
+
+import requests
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import folium
-from streamlit_folium import st_folium
+import numpy as np
+import pyarrow as pa
+# plotly and folium are imported where they are used: they are the
+# heaviest imports and are only needed on figure / map cache misses.
 
 # ---------- PAGE CONFIG ----------
 st.set_page_config(
@@ -13,8 +18,24 @@ st.set_page_config(
 )
 
 # ---------- DATA LOAD (PUBLIC LINK METHOD) ----------
-@st.cache_data(ttl=10)
+# Only the columns the dashboard actually touches are parsed from the sheet
+NEEDED_COLS = [
+    "Clinic Name", "Clinic_Type", "Mapped_District", "Brand_name",
+    "Latitude", "Longitude", "Email", "Google_Full_Address", "HQ",
+]
+# Columns the filters, KPIs, map and search can't work without
+REQUIRED_COLS = ["Clinic Name", "Clinic_Type", "Mapped_District", "Brand_name", "Latitude", "Longitude"]
+# Columns shown (and searched) in the detailed clinic list
+TABLE_COLS = ["Clinic Name", "Google_Full_Address", "Email", "Mapped_District", "Brand_name"]
+
+DATA_TTL = 600  # seconds before the sheet is fetched again (it changes rarely)
+
+@st.cache_data(ttl=DATA_TTL, show_spinner=False)
 def load_data():
+    # Returns (df, data_version). The version is a hash of the fetched sheet.
+    # Derived caches get this run's frame as an unhashed _df and are keyed on
+    # data_version instead, so they never refetch and a refresh with new
+    # content can't be answered from an older load.
     # -------------------------------------------------------------
     # 1. PASTE YOUR GOOGLE SHEET LINK BELOW
     # -------------------------------------------------------------
@@ -30,30 +51,136 @@ def load_data():
         else:
             csv_url = sheet_url
 
-        df = pd.read_csv(csv_url)
+        response = requests.get(csv_url, timeout=10)
+        response.raise_for_status()
+        buf = io.BytesIO(response.content)
+        data_version = hashlib.md5(response.content).hexdigest()
+
+        # The pyarrow engine (multithreaded) needs usecols as a list of
+        # existing columns, so read just the header first
+        header = pd.read_csv(buf, nrows=0).columns
+        buf.seek(0)
+        df = pd.read_csv(buf, engine="pyarrow", usecols=[c for c in NEEDED_COLS if c in header])
         
     except Exception as e:
         st.error(f"⚠️ Error loading data. Please ensure the Google Sheet is set to 'Anyone with the link'.\nError details: {e}")
-        return pd.DataFrame() 
+        return pd.DataFrame(), None
+
+    missing = [c for c in REQUIRED_COLS if c not in df.columns]
+    if missing:
+        st.error(f"⚠️ Column(s) {', '.join(missing)} not found. Check your CSV headers.")
+        return pd.DataFrame(), None
     
     # --- DATA CLEANING ---
     # 1. Standardize Clinic Type
     if "Clinic_Type" in df.columns:
         df["Clinic_Type"] = df["Clinic_Type"].astype(str).str.strip().str.title()
     
-    # 2. Rename columns / Fill Missing Values
-    if "source" in df.columns:
-        df = df.rename(columns={"source": "HQsource"})
+    # 2. Fill Missing Values
     if "Brand_name" in df.columns:
         df["Brand_name"] = df["Brand_name"].fillna("Unknown")
     if "Email" in df.columns:
         df["Email"] = df["Email"].fillna("Not Available")
 
-    return df
+    # 3. Low-cardinality columns as categoricals (filters compare int codes)
+    for col in ["Clinic_Type", "Mapped_District", "Brand_name", "HQ"]:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    # 4. Coordinates as float32 (ample for map markers, half the bytes). A
+    # stray non-numeric cell becomes NaN (off the map) instead of failing the load.
+    for col in ["Latitude", "Longitude"]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+
+    # 5. Tamil Nadu Lat/Lon Box flag, fixed per row (NaN coordinates fail every check)
+    lat = df["Latitude"].to_numpy()
+    lon = df["Longitude"].to_numpy()
+    df["_in_tn"] = (lat >= 8.0) & (lat <= 14.0) & (lon >= 76.0) & (lon <= 81.0)
+
+    # 6. Map popup HTML, built once with vectorized string concatenation
+    email = df["Email"].astype(str) if "Email" in df.columns else "Not Available"
+    df["_popup_html"] = (
+        '<div style="font-family:sans-serif; width:200px"><b>' + df["Clinic Name"].astype(str) + "</b><br>"
+        + '<span style="color:gray">' + df["Mapped_District"].astype(str) + "</span><br>"
+        + "📧 " + email + "</div>"
+    )
 
-df = load_data()
+    # 7. Lowercased search text for the detail table: its columns joined by
+    # newlines (a single-line query can't match across two fields)
+    search_cols = [c for c in TABLE_COLS if c in df.columns]
+    search_text = df[search_cols[0]].astype(str)
+    for c in search_cols[1:]:
+        search_text = search_text + "\n" + df[c].astype(str)
+    df["_search_text"] = search_text.str.lower()
+
+    # 8. Presort by district; boolean-mask filters keep this order, so the
+    # detail table never has to re-sort on a rerun. The sheet position is
+    # kept so "first row per brand" still means first in the sheet.
+    df["_sheet_row"] = np.arange(len(df), dtype="int32")
+    df = df.sort_values("Mapped_District", kind="stable").reset_index(drop=True)
+
+    return df, data_version
+
+@st.cache_data(ttl=DATA_TTL, show_spinner=False)
+def load_hq_reference(_df, data_version):
+    # Brand -> HQ lookup (Series indexed by brand), built once per data load
+    df = _df
+    if "HQ" not in df.columns:
+        return None
+    # groupby().first() on the categorical key: one pass, sorted by brand.
+    # Rows go back to sheet order first, so each brand keeps its first listed HQ.
+    return (
+        df.sort_values("_sheet_row")[["Brand_name", "HQ"]].dropna()
+        .groupby("Brand_name", observed=True, sort=True)["HQ"].first()
+    )
+
+# ---------- FILTER HELPERS ----------
+@st.cache_data(show_spinner=False, max_entries=32, ttl=DATA_TTL)
+def apply_filters(_df, data_version, types, districts, brands):
+    # Empty district/brand selections mean "all". Cached per selection so
+    # reruns that don't touch the filters (theme, search) skip the masks.
+    # One combined mask and a single take instead of three chained copies.
+    df = _df
+    mask = df["Clinic_Type"].isin(types)
+    if districts: mask &= df["Mapped_District"].isin(districts)
+    if brands: mask &= df["Brand_name"].isin(brands)
+    return df.loc[mask]
+
+@st.cache_data(ttl=DATA_TTL, show_spinner=False)
+def filter_options(_df, data_version, column, types=None, districts=()):
+    # Option lists only change with the upstream selections, not on every
+    # rerun. The frame isn't hashed per call; data_version identifies it.
+    df = _df
+    if types is None and isinstance(df[column].dtype, pd.CategoricalDtype):
+        # Unfiltered categorical: the categories already are the sorted, non-null values
+        return df[column].cat.categories.tolist()
+    subset = df if types is None else df[df["Clinic_Type"].isin(types)]
+    if districts:
+        subset = subset[subset["Mapped_District"].isin(districts)]
+    return sorted(subset[column].dropna().unique())
+
+def keep_valid_choices(key, options):
+    # When an upstream filter changes, drop the submitted values the new
+    # option list no longer offers and keep the rest (the widget would
+    # otherwise reset to "All"). Only written when something was dropped: any
+    # write marks the value as set by the app, and the browser would then
+    # overwrite picks the user hasn't submitted yet.
+    if key in st.session_state:
+        valid = set(options)
+        kept = [v for v in st.session_state[key] if v in valid]
+        if kept != st.session_state[key]:
+            st.session_state[key] = kept
+
+def nonzero_counts(series):
+    # value_counts() on a categorical also lists unobserved categories at 0
+    return series.value_counts().loc[lambda s: s > 0]
+
+df, data_version = load_data()
 
 if df.empty:
+    # Don't keep a failed fetch cached for the whole TTL
+    load_data.clear()
     st.stop()
 
 # ---------- THEME ----------
@@ -71,7 +198,13 @@ else:
     plotly_template = "plotly_dark"
 
 # ---------- STYLING ----------
-st.markdown(f"""
+# Only two possible stylesheets (one per theme), so build each string once.
+# The preconnect hints open the font connections before the @import is parsed.
+@st.cache_resource
+def theme_css(card_color):
+    return f"""
+    <link rel="preconnect" href="https://fonts.googleapis.com">
+    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
     <style>
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
     html, body, [class*="css"] {{ font-family: 'Inter', sans-serif; }}
@@ -82,123 +215,209 @@ st.markdown(f"""
         box-shadow: 0 4px 6px rgba(0,0,0,0.05);
     }}
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+st.markdown(theme_css(card_color), unsafe_allow_html=True)
 
 # ---------- HEADER ----------
 st.title("🏥 Tamil Nadu Fertility Clinic Market")
 st.divider()
 
 # ---------- FILTERS (TOP) ----------
-col_f1, col_f2, col_f3 = st.columns(3)
-
-# Filter 1: Type
-with col_f1:
-    clinic_type_options = sorted(df["Clinic_Type"].dropna().unique())
-    selected_types = st.multiselect("Clinic Type", options=clinic_type_options, default=clinic_type_options)
-    temp_df = df[df["Clinic_Type"].isin(selected_types)]
-
-# Filter 2: District
-with col_f2:
-    district_options = sorted(temp_df["Mapped_District"].dropna().unique())
-    selected_districts = st.multiselect("District", options=district_options, placeholder="All Districts")
-    if selected_districts:
-        temp_df = temp_df[temp_df["Mapped_District"].isin(selected_districts)]
-
-# Filter 3: Brand
-with col_f3:
-    available_brands = sorted(temp_df["Brand_name"].dropna().unique())
-    selected_brands = st.multiselect("Brand", options=available_brands, placeholder="All Brands")
+# The filters live in one form so picking several values costs a single rerun.
+# Downstream options cascade from the submitted selection; the stable keys
+# keep submitted choices that are still valid.
+with st.form("filter_form", border=False):
+    col_f1, col_f2, col_f3 = st.columns(3)
+
+    # Filter 1: Type
+    with col_f1:
+        clinic_type_options = filter_options(df, data_version, "Clinic_Type")
+        selected_types = tuple(st.multiselect("Clinic Type", options=clinic_type_options, default=clinic_type_options, key="filter_types"))
+
+    # Filter 2: District
+    with col_f2:
+        district_options = filter_options(df, data_version, "Mapped_District", selected_types)
+        keep_valid_choices("filter_districts", district_options)
+        selected_districts = tuple(st.multiselect("District", options=district_options, placeholder="All Districts", key="filter_districts"))
+
+    # Filter 3: Brand
+    with col_f3:
+        available_brands = filter_options(df, data_version, "Brand_name", selected_types, selected_districts)
+        keep_valid_choices("filter_brands", available_brands)
+        selected_brands = tuple(st.multiselect("Brand", options=available_brands, placeholder="All Brands", key="filter_brands"))
+
+    st.form_submit_button("Apply filters")
 
 # Apply Filters
-filtered = df[df["Clinic_Type"].isin(selected_types)]
-if selected_districts: filtered = filtered[filtered["Mapped_District"].isin(selected_districts)]
-if selected_brands: filtered = filtered[filtered["Brand_name"].isin(selected_brands)]
+selection = (selected_types, selected_districts, selected_brands)
+filtered = apply_filters(df, data_version, *selection)
+
+# Each grouping column is counted once; the KPIs and charts below reuse these
+type_counts = nonzero_counts(filtered["Clinic_Type"])
+dist_counts = nonzero_counts(filtered["Mapped_District"])
+brand_counts = nonzero_counts(filtered["Brand_name"])
 
 # ---------- METRICS ----------
 c1, c2, c3, c4 = st.columns(4)
 c1.metric("Total Clinics", len(filtered))
-c2.metric("Districts", filtered['Mapped_District'].nunique())
-c3.metric("Chained", len(filtered[filtered['Clinic_Type'] == 'Chained']))
-c4.metric("Independent", len(filtered[filtered['Clinic_Type'] == 'Independent']))
+c2.metric("Districts", dist_counts.size)
+c3.metric("Chained", int(type_counts.get("Chained", 0)))
+c4.metric("Independent", int(type_counts.get("Independent", 0)))
 
 st.markdown("---")
 
+# Nothing below (charts, map, tables) has anything to show for an empty
+# selection, so stop before building any figure or table.
+if filtered.empty:
+    st.info("No clinics match the selected filters.")
+    st.stop()
+
 # ---------- CHARTS ----------
+# Figures are cached on the aggregated counts, so reruns that leave the
+# counts unchanged (search, map, unrelated widgets) reuse the built figure.
+PLOTLY_CONFIG = {"responsive": True}
+
+def chart_items(counts, top=None):
+    # Hashable (labels, values) pair for the cached figure builders
+    if top is not None:
+        counts = counts.head(top)
+    return tuple(counts.index), tuple(counts.tolist())
+
+@st.cache_data(show_spinner=False)
+def type_pie_figure(types, counts, template):
+    import plotly.graph_objects as go
+    fig = go.Figure(go.Pie(labels=types, values=counts, hole=0.5))
+    fig.update_layout(template=template)
+    return fig
+
+@st.cache_data(show_spinner=False)
+def district_bar_figure(districts, counts, template):
+    import plotly.graph_objects as go
+    fig = go.Figure(go.Bar(x=counts, y=districts, orientation='h'))
+    fig.update_layout(
+        template=template, xaxis_title="Clinics", yaxis_title="Mapped_District",
+        yaxis=dict(autorange="reversed"),
+    )
+    return fig
+
+@st.cache_data(show_spinner=False)
+def brand_bar_figure(brands, counts, template):
+    import plotly.graph_objects as go
+    fig = go.Figure(go.Bar(x=brands, y=counts))
+    fig.update_layout(template=template, xaxis_title="Brand_name", yaxis_title="Clinics")
+    return fig
+
 col1, col2 = st.columns(2)
 with col1:
-    if not filtered.empty:
-        fig = px.pie(filtered, names="Clinic_Type", hole=0.5, template=plotly_template)
-        st.plotly_chart(fig, use_container_width=True)
+    fig = type_pie_figure(*chart_items(type_counts), plotly_template)
+    st.plotly_chart(fig, width="stretch", config=PLOTLY_CONFIG, key="type_pie")
 with col2:
-    if not filtered.empty:
-        top_dist = filtered["Mapped_District"].value_counts().head(10).reset_index()
-        fig = px.bar(top_dist, x="count", y="Mapped_District", orientation='h', template=plotly_template)
-        fig.update_layout(yaxis=dict(autorange="reversed"))
-        st.plotly_chart(fig, use_container_width=True)
+    fig = district_bar_figure(*chart_items(dist_counts, top=10), plotly_template)
+    st.plotly_chart(fig, width="stretch", config=PLOTLY_CONFIG, key="district_bar")
 
 # ---------- MAP (Google Maps + TN Filter) ----------
-col_map, col_brand = st.columns([1.5, 1])
-
-with col_map:
-    st.subheader("Geographic Footprint (Google Maps)")
-    
-    # Filter specifically for Tamil Nadu Lat/Lon Box
-    mask_tn = (
-        (filtered["Latitude"] >= 8.0) & (filtered["Latitude"] <= 14.0) &
-        (filtered["Longitude"] >= 76.0) & (filtered["Longitude"] <= 81.0)
-    )
-    geo_data = filtered[mask_tn].copy()
-
-    if not geo_data.empty:
-        tn_center = [11.1271, 78.6569]
-        m = folium.Map(location=tn_center, zoom_start=7, tiles=None)
-
-        folium.TileLayer(
-            tiles='https://mt1.google.com/vt/lyrs=m&x={x}&y={y}&z={z}',
-            attr='Google',
-            name='Google Maps',
-            overlay=False,
-            control=True
-        ).add_to(m)
-
-        for _, row in geo_data.iterrows():
-            color = "#e74c3c" if row["Clinic_Type"] == "Chained" else "#2980b9"
-            
-            popup_html = f"""
-            <div style="font-family:sans-serif; width:200px">
-                <b>{row['Clinic Name']}</b><br>
-                <span style="color:gray">{row['Mapped_District']}</span><br>
-                📧 {row['Email']}
-            </div>
-            """
+# Leaflet callback for FastMarkerCluster; row = [lat, lon, color, popup_html]
+MARKER_CALLBACK = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: 6, color: row[2], fill: true, fillOpacity: 0.8
+    });
+    marker.bindPopup(row[3], {maxWidth: 250});
+    return marker;
+}
+"""
+
+# Above this many markers the map clusters them client-side
+CLUSTER_THRESHOLD = 200
+
+@st.cache_resource
+def base_map():
+    # Map skeleton + Google tile layer never change; build once, deep-copy per
+    # render (a copy is ~10x cheaper than constructing it) and add markers.
+    import folium
+
+    # prefer_canvas: circle markers are painted on one <canvas>, not one SVG node each
+    tn_center = [11.1271, 78.6569]
+    m = folium.Map(location=tn_center, zoom_start=7, tiles=None, prefer_canvas=True)
+
+    folium.TileLayer(
+        tiles='https://mt1.google.com/vt/lyrs=m&x={x}&y={y}&z={z}',
+        attr='Google',
+        name='Google Maps',
+        overlay=False,
+        control=True
+    ).add_to(m)
+    return m
+
+@st.cache_data(show_spinner=False, max_entries=32, ttl=DATA_TTL)
+def build_map_html(_df, data_version, types, districts, brands):
+    # The rendered Leaflet page is a pure function of the data version and
+    # filter selection, so it is keyed on those: a cache hit hashes a few small
+    # values instead of the map rows, and skips Folium and the Jinja2 render.
+    filtered = apply_filters(_df, data_version, types, districts, brands)
+    # Filter specifically for Tamil Nadu Lat/Lon Box (flag precomputed at load);
+    # positional take on the raw bool array, no index alignment
+    geo_data = filtered.iloc[filtered["_in_tn"].to_numpy()]
+
+    import folium
+    from folium.plugins import FastMarkerCluster
+
+    m = copy.deepcopy(base_map())
+
+    # One JSON payload; markers and popups are built client-side.
+    # Columns go out as plain arrays so no row is ever boxed as a Series.
+    # float32 coordinates widen to 17-digit floats in JSON; 5 decimals (~1 m)
+    # is all Leaflet needs and keeps the embedded payload compact.
+    lats = np.round(geo_data["Latitude"].to_numpy(dtype="float64"), 5).tolist()
+    lons = np.round(geo_data["Longitude"].to_numpy(dtype="float64"), 5).tolist()
+    colors = np.where((geo_data["Clinic_Type"] == "Chained").to_numpy(), "#e74c3c", "#2980b9").tolist()
+    popups = geo_data["_popup_html"].to_numpy().tolist()
+    marker_rows = list(zip(lats, lons, colors, popups))
+    if len(marker_rows) > CLUSTER_THRESHOLD:
+        FastMarkerCluster(data=marker_rows, callback=MARKER_CALLBACK).add_to(m)
+    else:
+        # Few enough to draw every clinic individually on the canvas, unclustered
+        for lat, lon, color, popup in marker_rows:
             folium.CircleMarker(
-                location=[row["Latitude"], row["Longitude"]],
+                location=[lat, lon],
                 radius=6, color=color, fill=True, fill_opacity=0.8,
-                popup=folium.Popup(popup_html, max_width=250)
+                popup=folium.Popup(popup, max_width=250)
             ).add_to(m)
-            
-        st_folium(m, height=400, use_container_width=True)
-    else:
+
+    return m.get_root().render()
+
+def render_map(df, filtered, data_version, selection):
+    st.subheader("Geographic Footprint (Google Maps)")
+    
+    if not filtered["_in_tn"].any():
         st.info("No clinics found within Tamil Nadu bounds.")
+        return
+
+    st.iframe(build_map_html(df, data_version, *selection), height=400)
+
+col_map, col_brand = st.columns([1.5, 1])
+
+with col_map:
+    render_map(df, filtered, data_version, selection)
 
 with col_brand:
     st.subheader("Top Brands")
-    if not filtered.empty:
-        top_brands = filtered["Brand_name"].value_counts().head(10).reset_index()
-        fig = px.bar(top_brands, x="Brand_name", y="count", template=plotly_template)
-        st.plotly_chart(fig, use_container_width=True)
+    fig = brand_bar_figure(*chart_items(brand_counts, top=10), plotly_template)
+    st.plotly_chart(fig, width="stretch", config=PLOTLY_CONFIG, key="brand_bar")
 
 st.markdown("---")
 
 # ---------- TABLE 1: BRAND HEADQUARTERS ----------
 st.subheader("🏢 Brand Headquarters")
 
-visible_brands = filtered["Brand_name"].unique()
+# Brands present in the selection, already counted for the Top Brands chart
+visible_brands = brand_counts.index
 
-if "HQ" in df.columns:
-    hq_reference = df[["Brand_name", "HQ"]].dropna().drop_duplicates(subset=["Brand_name"])
-    final_hq_table = hq_reference[hq_reference["Brand_name"].isin(visible_brands)].sort_values("Brand_name")
-    st.dataframe(final_hq_table, use_container_width=True, hide_index=True)
+hq_reference = load_hq_reference(df, data_version)
+if hq_reference is not None:
+    final_hq_table = hq_reference[hq_reference.index.isin(visible_brands)].reset_index()
+    st.dataframe(final_hq_table, width="stretch", hide_index=True)
 else:
     st.warning("⚠️ Column 'HQ' not found. Check your CSV headers.")
 
@@ -207,26 +426,52 @@ st.markdown("---")
 # ---------- TABLE 2: DETAILED LIST WITH SEARCH (NEW!) ----------
 st.subheader("🏥 Detailed Clinic List")
 
-# 1. Search Bar
-search_query = st.text_input("🔍 Search Clinic, District, or Brand", placeholder="Type to search... (e.g., 'Apollo' or 'Chennai')")
+TABLE_ROW_LIMIT = 500
 
-cols_wanted = ["Clinic Name", "Google_Full_Address", "Email", "Mapped_District", "Brand_name"]
-valid_cols = [c for c in cols_wanted if c in filtered.columns]
+@st.cache_data(show_spinner=False, max_entries=64, ttl=DATA_TTL)
+def clinic_table(_df, data_version, types, districts, brands, search_query, row_limit):
+    # Returns (Arrow table of the rows to display, number of matches). Cached
+    # per data version/selection/query/limit, so re-showing a view skips the
+    # search and the pandas -> Arrow conversion st.dataframe would otherwise redo.
+    filtered = apply_filters(_df, data_version, types, districts, brands)
 
-# 2. Filter Logic based on search
-if search_query:
-    # Check if the search query exists in ANY of the visible columns
-    # We convert everything to string (.astype(str)) and lowercase (.str.lower()) for easy matching
-    mask = filtered[valid_cols].apply(
-        lambda row: row.astype(str).str.lower().str.contains(search_query.lower()).any(), axis=1
+    valid_cols = [c for c in TABLE_COLS if c in filtered.columns]
+
+    # Filter Logic based on search
+    if search_query:
+        # Check if the search query exists in ANY of the visible columns: one
+        # plain-substring scan over the lowercased text precomputed at load.
+        mask = filtered["_search_text"].str.contains(search_query.lower(), regex=False, na=False).to_numpy()
+        table_to_show = filtered[mask]
+    else:
+        table_to_show = filtered
+
+    rows = pa.Table.from_pandas(table_to_show[valid_cols].head(row_limit), preserve_index=False)
+    return rows, len(table_to_show)
+
+@st.fragment
+def render_clinic_table(df, data_version, selection):
+    # Searching reruns only this section
+    # 1. Search Bar + row cap (bounds the Arrow payload sent to the browser).
+    # Inside a form, the table updates once on submit (button or Enter)
+    # rather than on every edit.
+    with st.form("search_form", border=False):
+        col_search, col_rows = st.columns([4, 1])
+        search_query = col_search.text_input("🔍 Search Clinic, District, or Brand", placeholder="Type to search... (e.g., 'Apollo' or 'Chennai')")
+        row_limit = col_rows.number_input("Rows to display", min_value=50, value=TABLE_ROW_LIMIT, step=50)
+        st.form_submit_button("Search")
+
+    # 2. Search + Arrow conversion (cached)
+    rows, n_matches = clinic_table(df, data_version, *selection, search_query, row_limit)
+
+    # 3. Show Table
+    if n_matches > row_limit:
+        st.caption(f"Showing the first {row_limit:,} of {n_matches:,} matching clinics.")
+    st.dataframe(
+        rows,
+        width="stretch",
+        hide_index=True,
+        column_config={"Google_Full_Address": st.column_config.TextColumn(width="large")},
     )
-    table_to_show = filtered[mask]
-else:
-    table_to_show = filtered
-
-# 3. Show Table
-st.dataframe(
-    table_to_show[valid_cols].sort_values("Mapped_District"),
-    use_container_width=True,
-    hide_index=True
-)
\ No newline at end of file
+
+render_clinic_table(df, data_version, selection)